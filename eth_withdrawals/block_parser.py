@@ -1,11 +1,12 @@
 """This module parses the consenus layer Execution Payload."""
+from concurrent.futures import Future
 import logging
-from pathlib import Path
 from time import sleep
-from typing import Any
+from typing import Any, Optional
+import msgspec
 from eth_withdrawals.constants import DATA_DIR, ENDPOINT, SLOTS_PER_EPOCH
 from eth_withdrawals.models import (
-    EthereumApiBlockResponse,
+    EthereumApiBlockSummaryResponse,
     Withdrawal,
 )
 from eth_withdrawals.fetcher import Fetcher
@@ -14,23 +15,82 @@ from eth_withdrawals.utils import (
     EthereumAPIError,
     MissingHeightError,
     RequestError,
+    SecondsToFinalization,
     SlotToEpoch,
     SlotToTime,
+    Writer,
     get_output_format,
-    write_data,
+    get_writer,
 )
-from pydantic import ValidationError
+from msgspec import ValidationError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ExecutionPayload")
 
+# The csv columns
+EXEC_PAYLOAD_CSV_FIELDS = (
+    "parent_hash",
+    "fee_recipient",
+    "state_root",
+    "receipts_root",
+    "logs_bloom",
+    "prev_randao",
+    "block_number",
+    "gas_limit",
+    "gas_used",
+    "timestamp",
+    "extra_data",
+    "base_fee_per_gas",
+    "block_hash",
+    "slot",
+    "epoch",
+    "proposer_index",
+    "data_type",
+    "transaction_count",
+    "withdrawals_count",
+    "withdrawals_amount",
+    "withdrawals_latest_sweep_index",
+    "withdrawals_latest_validator_index",
+    "withdrawals_unique_validator_count",
+    "withdrawals_unique_withdrawal_count",
+)
+# The execution payload strings are passed through unvalidated, so they may need
+# quoting. The other columns are integers, validated hex or generated here.
+EXEC_PAYLOAD_CSV_QUOTED_FIELDS = frozenset(
+    [
+        "parent_hash",
+        "fee_recipient",
+        "state_root",
+        "receipts_root",
+        "logs_bloom",
+        "prev_randao",
+        "extra_data",
+        "block_hash",
+    ]
+)
+WITHDRAWAL_CSV_FIELDS = (
+    "slot",
+    "epoch",
+    "timestamp",
+    "data_type",
+    "withdrawal_index",
+    "validator_index",
+    "withdrawal_address",
+    "withdrawal_amount",
+)
+
 
 def transform_execution_payload(
-    api_response: EthereumApiBlockResponse, **kwarg
+    api_response: EthereumApiBlockSummaryResponse,
+    epoch: Optional[int] = None,
+    timestamp: Optional[str] = None,
+    **kwarg,
 ) -> dict[str, dict[str, Any]]:
     """parse the execution payload data.
 
     :param api_response: parsed Block api responsed
+    :param epoch: the epoch of the block, computed from its slot when not given
+    :param timestamp: the formatted time of the block, computed when not given
     :return: dictionary with all the information of the execution payload
 
     Return example:
@@ -56,12 +116,13 @@ def transform_execution_payload(
     exec_payload = message.body.execution_payload
     if not exec_payload:
         return {}
-    output: dict[str, Any] = exec_payload.dict(exclude={"transactions", "withdrawals"})
+    output: dict[str, Any] = msgspec.structs.asdict(exec_payload)
+    del output["transactions"], output["withdrawals"]
     output |= {
         "slot": message.slot,
-        "epoch": SlotToEpoch(message.slot),
+        "epoch": SlotToEpoch(message.slot) if epoch is None else epoch,
         "proposer_index": message.proposer_index,
-        "timestamp": DateTimeConverter(SlotToTime(message.slot)),
+        "timestamp": timestamp or DateTimeConverter(SlotToTime(message.slot)),
         "data_type": "execution_payload",
         "transaction_count": len(exec_payload.transactions),
     } | get_withdrawal_stats(exec_payload.withdrawals)
@@ -76,30 +137,42 @@ def get_withdrawal_stats(withdrawals: list[Withdrawal]) -> dict:
     :return: dictionary with withdrawal statistics
     """
     withdrawals = withdrawals or []
+    amount = 0
+    latest_sweep_index = -1
+    latest_validator_index = -1
+    validators = set()
+    addresses = set()
+    # Single pass over the withdrawals rather than one per statistic
+    for withdrawal in withdrawals:
+        amount += withdrawal.amount
+        if withdrawal.index > latest_sweep_index:
+            latest_sweep_index = withdrawal.index
+        if withdrawal.validator_index > latest_validator_index:
+            latest_validator_index = withdrawal.validator_index
+        validators.add(withdrawal.validator_index)
+        addresses.add(withdrawal.address)
+
     return {
         "withdrawals_count": len(withdrawals),
-        "withdrawals_amount": sum(withdrawal.amount for withdrawal in withdrawals),
-        "withdrawals_latest_sweep_index": max(
-            (withdrawal.index for withdrawal in withdrawals), default=-1
-        ),
-        "withdrawals_latest_validator_index": max(
-            (withdrawal.validator_index for withdrawal in withdrawals), default=-1
-        ),
-        "withdrawals_unique_validator_count": len(
-            {withdrawal.validator_index for withdrawal in withdrawals}
-        ),
-        "withdrawals_unique_withdrawal_count": len(
-            {withdrawal.address for withdrawal in withdrawals}
-        ),
+        "withdrawals_amount": amount,
+        "withdrawals_latest_sweep_index": latest_sweep_index,
+        "withdrawals_latest_validator_index": latest_validator_index,
+        "withdrawals_unique_validator_count": len(validators),
+        "withdrawals_unique_withdrawal_count": len(addresses),
     }
 
 
 def transform_withdrawals_data(
-    api_response: EthereumApiBlockResponse, **kwarg
+    api_response: EthereumApiBlockSummaryResponse,
+    epoch: Optional[int] = None,
+    timestamp: Optional[str] = None,
+    **kwarg,
 ) -> dict[str, dict[str, Any]]:
     """parse the withdrawals data.
 
     :param api_response: parsed Block api response
+    :param epoch: the epoch of the block, computed from its slot when not given
+    :param timestamp: the formatted time of the block, computed when not given
     :return: list of all withdrawals information from the execution payload
 
     Return example:
@@ -126,8 +199,8 @@ def transform_withdrawals_data(
 
     slot_data = {
         "slot": message.slot,
-        "epoch": SlotToEpoch(message.slot),
-        "timestamp": DateTimeConverter(SlotToTime(message.slot)),
+        "epoch": SlotToEpoch(message.slot) if epoch is None else epoch,
+        "timestamp": timestamp or DateTimeConverter(SlotToTime(message.slot)),
         "data_type": "withdrawals_data",
     }
     return [
@@ -143,81 +216,129 @@ def transform_withdrawals_data(
 
 
 def process_slot(
-    slot: int,
-    fetcher: Fetcher,
-    output_format: str,
-    withdrawals_output_file: Path,
-    exc_payload_output_file: Path,
+    slot_data: EthereumApiBlockSummaryResponse,
+    withdrawals_writer: Writer,
+    exc_payload_writer: Writer,
 ) -> None:
-    """Fetch, parse, transform and write the data for a given slot.
+    """Transform and write the data for a given slot.
+
+    :param slot_data: the parsed block of the slot to process
+    :type slot_data: EthereumApiBlockSummaryResponse
+    :param withdrawals_writer: the writer for the withdrawals data
+    :type withdrawals_writer: Writer
+    :param exc_payload_writer: the writer for the execution payload data
+    :type exc_payload_writer: Writer
+    """
+    # Shared by both transforms, rather than each converting the slot again
+    slot = slot_data.data.message.slot
+    slot_time = {
+        "epoch": SlotToEpoch(slot),
+        "timestamp": DateTimeConverter(SlotToTime(slot)),
+    }
+
+    execution_payload = transform_execution_payload(slot_data, **slot_time)
+    exc_payload_writer.write(execution_payload)
+
+    withdrawals_writer.write_many(transform_withdrawals_data(slot_data, **slot_time))
+
 
-    :param slot: the slot to process
-    :type slot: int
+def fetch_slots(slots: range, fetcher: Fetcher) -> dict[int, Future]:
+    """Fetch and parse the blocks of the given slots concurrently.
+
+    :param slots: the slots to fetch
+    :type slots: range
     :param fetcher: a fetcher instance
     :type fetcher: Fetcher
-    :param output_format: the output file's format
-    :type output_format: str
-    :param withdrawals_output_file: the output file for the withdrawals data
-    :type withdrawals_output_file: Path
-    :param exc_payload_output_file: the output file for the execution payload data
-    :type exc_payload_output_file: Path
+    :return: the pending block for each slot
     """
-    slot_data = fetcher.fetch_and_parse(
-        method=f"/eth/v2/beacon/blocks/{slot}",
-        parser=EthereumApiBlockResponse,
-        err_msg="Could not find requested block",
+    return dict(
+        fetcher.fetch_and_parse_many(
+            methods={slot: f"/eth/v2/beacon/blocks/{slot}" for slot in slots},
+            parser=EthereumApiBlockSummaryResponse,
+            err_msg="Could not find requested block",
+        )
     )
 
-    execution_payload = transform_execution_payload(slot_data)
-    write_data(execution_payload, exc_payload_output_file, output_format)
 
-    withdrawals = transform_withdrawals_data(slot_data)
-    for withdrawal in withdrawals:
-        write_data(withdrawal, withdrawals_output_file, output_format)
+def process_slots(
+    slots: range,
+    fetcher: Fetcher,
+    withdrawals_writer: Writer,
+    exc_payload_writer: Writer,
+) -> None:
+    """Fetch the blocks of the slots concurrently, then write them in slot order.
+
+    :param slots: the slots to process
+    :type slots: range
+    :param fetcher: a fetcher instance
+    :type fetcher: Fetcher
+    :param withdrawals_writer: the writer for the withdrawals data
+    :type withdrawals_writer: Writer
+    :param exc_payload_writer: the writer for the execution payload data
+    :type exc_payload_writer: Writer
+    """
+    blocks = fetch_slots(slots, fetcher)
+    for slot in slots:
+        try:
+            process_slot(blocks[slot].result(), withdrawals_writer, exc_payload_writer)
+        except (
+            RequestError,
+            MissingHeightError,
+            EthereumAPIError,
+            ValidationError,
+        ):
+            logger.warning("Could not get block %s, skipping.", slot)
+    withdrawals_writer.flush()
+    exc_payload_writer.flush()
 
 
 def main():
     """Main function to orchestrate the processing of finalized slots."""
     output_format = get_output_format()
 
-    withdrawals_output_file = DATA_DIR / f"withdrawals_data.{output_format}"
-    exc_payload_output_file = DATA_DIR / f"execution_payload.{output_format}"
+    withdrawals_writer = get_writer(
+        DATA_DIR / f"withdrawals_data.{output_format}",
+        output_format,
+        WITHDRAWAL_CSV_FIELDS,
+    )
+    exc_payload_writer = get_writer(
+        DATA_DIR / f"execution_payload.{output_format}",
+        output_format,
+        EXEC_PAYLOAD_CSV_FIELDS,
+        EXEC_PAYLOAD_CSV_QUOTED_FIELDS,
+    )
 
     fetcher = Fetcher(ENDPOINT, logger)
     last_finalized_slot = 0
-    while True:
-        try:
-            finalized_slot = fetcher.get_finalized_slot()
-        except RequestError:
-            logger.warning("Could not get finalized slot, trying again in 60s.")
-            sleep(60)  # wait a minute and try again
-            continue
+    with withdrawals_writer, exc_payload_writer:
+        while True:
+            try:
+                finalized_slot = fetcher.get_finalized_slot()
+            except RequestError:
+                logger.warning("Could not get finalized slot, trying again in 60s.")
+                sleep(60)  # wait a minute and try again
+                continue
 
-        last_finalized_slot = last_finalized_slot or finalized_slot - SLOTS_PER_EPOCH
+            last_finalized_slot = (
+                last_finalized_slot or finalized_slot - SLOTS_PER_EPOCH
+            )
 
-        if finalized_slot == last_finalized_slot:
-            sleep(60)  # wait a minute and try again
-            continue
+            if finalized_slot == last_finalized_slot:
+                sleep(60)  # wait a minute and try again
+                continue
 
-        logger.info("Parsing slots %s to %s", last_finalized_slot, finalized_slot)
-        for slot in range(last_finalized_slot, finalized_slot):
-            try:
-                process_slot(
-                    slot,
-                    fetcher,
-                    output_format,
-                    withdrawals_output_file,
-                    exc_payload_output_file,
+            logger.info("Parsing slots %s to %s", last_finalized_slot, finalized_slot)
+            # An epoch at a time, so a long backlog doesn't hold every block in memory
+            for start in range(last_finalized_slot, finalized_slot, SLOTS_PER_EPOCH):
+                end = min(start + SLOTS_PER_EPOCH, finalized_slot)
+                process_slots(
+                    range(start, end), fetcher, withdrawals_writer, exc_payload_writer
                 )
-            except (
-                RequestError,
-                MissingHeightError,
-                EthereumAPIError,
-                ValidationError,
-            ):
-                logger.warning("Could not get block %s, skipping.", slot)
-        logger.info("Parsing complete.")
-        last_finalized_slot = finalized_slot
+            logger.info("Parsing complete.")
+            last_finalized_slot = finalized_slot
+
+            # Finality advances an epoch at a time, wait until the next one is due
+            sleep(max(SecondsToFinalization(finalized_slot + SLOTS_PER_EPOCH), 0))
 
 
 if __name__ == "__main__":
@@ -4,6 +4,10 @@ SLOTS_PER_EPOCH = 32
 GENESIS_TIMESTAMP = 1_606_824_023
 SECONDS_PER_SLOT = 12
 MAX_WITHDRAWALS_PER_PAYLOAD = 16
-MAX_BLS_TO_EXECUTION_CHANGES = 16
+MAX_TRANSACTIONS_PER_PAYLOAD = 1_048_576
 ENDPOINT = ""
+MAX_CONCURRENT_REQUESTS = 16
+HTTP_POOL_SIZE = 32
+WRITE_BUFFER_SIZE = 64 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
 DATA_DIR = Path.cwd() / "data"
@@ -1,35 +1,55 @@
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
-from pydantic import BaseModel, ValidationError
+import msgspec
+from msgspec import Struct
 from eth_withdrawals.constants import (
     GENESIS_TIMESTAMP,
+    HTTP_POOL_SIZE,
+    MAX_CONCURRENT_REQUESTS,
     SECONDS_PER_SLOT,
     SLOTS_PER_EPOCH,
+    STREAM_CHUNK_SIZE,
 )
-from typing import Type
+from typing import Hashable, Iterator, Type
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 
 from eth_withdrawals.utils import EthereumAPIError, MissingHeightError, RequestError
 
 
 class Fetcher:
-    def __init__(self, endpoint: str, logger: logging.Logger):
+    def __init__(
+        self,
+        endpoint: str,
+        logger: logging.Logger,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+    ):
         self.endpoint = endpoint
         self.logger = logger
+        self.max_workers = max_workers
 
-    def fetch(self, method: str, **kwargs) -> dict:
-        """Fetch data from ethereum's consensus API.
+        # Keep-alive connections shared by all requests, sized for the worker pool
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_bytes(self, method: str, **kwargs) -> bytes:
+        """Fetch the undecoded response body from ethereum's consensus API.
 
         :param method:
         :type method: str
         :param kwargs:
-        :rtype: dict
+        :rtype: bytes
         """
         try:
             start = time.time()
             self.logger.debug("Making request")
-            api_response = requests.get(
+            api_response = self.session.get(
                 url=self.endpoint + method,
                 headers=kwargs.get("headers"),
                 params=kwargs.get("params"),
@@ -39,9 +59,64 @@ class Fetcher:
             self.logger.warning(exc)
             raise RequestError(exc)
 
+        return api_response.content
+
+    def fetch_stream(
+        self,
+        method: str,
+        err_msg: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        **kwargs,
+    ) -> Iterator[bytes]:
+        """Stream the undecoded response body from ethereum's consensus API.
+
+        The body is yielded in chunks while it downloads, so a large response is
+        never held in memory at once. Error responses are small and are read whole
+        to be checked like in `parse_response`.
+
+        :param method:
+        :type method: str
+        :param err_msg: the message returned when the requested data doesn't exist
+        :type err_msg: str
+        :param chunk_size: the size of the yielded chunks
+        :type chunk_size: int
+        :param kwargs:
+        :rtype: Iterator[bytes]
+        """
+        try:
+            self.logger.debug("Making streaming request")
+            with self.session.get(
+                url=self.endpoint + method,
+                headers=kwargs.get("headers"),
+                params=kwargs.get("params"),
+                stream=True,
+            ) as api_response:
+                if not api_response.ok:
+                    try:
+                        error = msgspec.json.decode(api_response.content)
+                    except msgspec.DecodeError:
+                        error = api_response.content
+                    self.check_error_response(error, err_msg)
+                    raise RequestError(
+                        f"API returned status {api_response.status_code}: {error}"
+                    )
+                yield from api_response.iter_content(chunk_size)
+        except requests.RequestException as exc:
+            self.logger.warning(exc)
+            raise RequestError(exc)
+
+    def fetch(self, method: str, **kwargs) -> dict:
+        """Fetch data from ethereum's consensus API.
+
+        :param method:
+        :type method: str
+        :param kwargs:
+        :rtype: dict
+        """
+        api_response = self.fetch_bytes(method, **kwargs)
         try:
-            response_json = api_response.json()
-        except requests.JSONDecodeError as exc:
+            return msgspec.json.decode(api_response)
+        except msgspec.DecodeError as exc:
             self.logger.warning(
                 "API did not return a valid JSON:\napi_endpoint=%s, api_response=%s",
                 self.endpoint + method,
@@ -49,23 +124,16 @@ class Fetcher:
             )
             raise RequestError(exc)
 
-        return response_json
-
-    def parse_response(
-        self,
-        api_response: dict,
-        parser: Type[BaseModel],
-        err_msg: str = "block can't be nil",
-    ):
-        """parse_response.
+    def check_error_response(self, api_response: dict, err_msg: str) -> None:
+        """Raise if the api response is an error message.
 
         :param api_response:
         :type api_response: dict
-        :param parser:
-        :type parser: BaseModel
-        :param err_msg:
-        :type err_msg: str, defaults to 'block can't be nil'
+        :param err_msg: the message returned when the requested data doesn't exist
+        :type err_msg: str
         """
+        if not isinstance(api_response, dict):
+            return
         if (response_code := api_response.get("code")) and (
             response_msg := api_response.get("message")
         ):
@@ -82,24 +150,75 @@ class Fetcher:
                     api_response,
                 )
 
+    def parse_response(
+        self,
+        api_response: bytes,
+        parser: Type[Struct],
+        err_msg: str = "block can't be nil",
+    ):
+        """parse_response.
+
+        The response is decoded and validated straight into the parser, it is only
+        checked for an error message when that fails.
+
+        :param api_response:
+        :type api_response: bytes
+        :param parser:
+        :type parser: Struct
+        :param err_msg:
+        :type err_msg: str, defaults to 'block can't be nil'
+        """
         try:
-            return parser.parse_obj(api_response)
-        except ValidationError as exc:
+            return msgspec.json.decode(api_response, type=parser, strict=False)
+        except msgspec.ValidationError as exc:
+            self.check_error_response(msgspec.json.decode(api_response), err_msg)
             self.logger.error(
-                "Pydantic failed to parse api response: api_response='%s', exception='%s'",
+                "msgspec failed to parse api response: api_response='%s', exception='%s'",
                 api_response,
                 exc,
             )
             raise
+        except msgspec.DecodeError as exc:
+            self.logger.warning(
+                "API did not return a valid JSON: api_response=%s", api_response
+            )
+            raise RequestError(exc)
 
     def fetch_and_parse(
-        self, *, method: str, parser: Type[BaseModel], err_msg: str
-    ) -> BaseModel:
-        api_response = self.fetch(method)
+        self, *, method: str, parser: Type[Struct], err_msg: str
+    ) -> Struct:
+        api_response = self.fetch_bytes(method)
         return self.parse_response(
             api_response=api_response, parser=parser, err_msg=err_msg
         )
 
+    def fetch_and_parse_many(
+        self, *, methods: dict[Hashable, str], parser: Type[Struct], err_msg: str
+    ) -> Iterator[tuple[Hashable, Future]]:
+        """Fetch and parse several methods concurrently.
+
+        Futures are yielded as soon as they complete, so the caller is responsible
+        for restoring any ordering it needs. Calling ``future.result()`` returns the
+        parsed response or raises the same exceptions as `fetch_and_parse`.
+
+        :param methods: the methods to fetch, keyed by an identifier (e.g. the slot)
+        :type methods: dict[Hashable, str]
+        :param parser:
+        :type parser: Struct
+        :param err_msg:
+        :type err_msg: str
+        :rtype: Iterator[tuple[Hashable, Future]]
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.fetch_and_parse, method=method, parser=parser, err_msg=err_msg
+                ): key
+                for key, method in methods.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future
+
     def get_finalized_slot(self):
         """Get the latest finalized slot from the beacon chain.
 
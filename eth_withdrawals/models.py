@@ -1,35 +1,45 @@
 """This module parses the consenus layer Execution Payload."""
 from enum import Enum
-from typing import Optional, Union
+from typing import Annotated, Literal, Optional
 from eth_withdrawals.constants import (
-    MAX_BLS_TO_EXECUTION_CHANGES,
+    MAX_TRANSACTIONS_PER_PAYLOAD,
     MAX_WITHDRAWALS_PER_PAYLOAD,
 )
 
-from pydantic import constr, conint, conlist, BaseModel
+from msgspec import Meta, Raw, Struct
 
-Hex40 = constr(regex="^0x[a-fA-F0-9]{40}$")
-Hex64 = constr(regex="^0x[a-fA-F0-9]{64}$")
-HexExtraData = constr(regex="^0x[a-fA-F0-9]{0,64}$")
-HexTransaction = constr(regex="^0x[a-fA-F0-9]{0,2147483648}$")
-Hex96 = constr(regex="^0x[a-fA-F0-9]{96}$")
-Hex192 = constr(regex="^0x[a-fA-F0-9]{192}$")
-Hex512 = constr(regex="^0x[a-fA-F0-9]{512}$")
-ValIndex = conint(ge=0)
-WithdrawalIndex = conint(ge=0)
-PosInt = conint(ge=0)
 
+def hex_string(digits: int) -> type:
+    """A 0x prefixed string of exactly `digits` hex digits.
 
-class EthereumVersion(Enum):
-    """Available Ethereum Versions."""
+    The length is checked before the pattern, so strings of the wrong length are
+    rejected without running the regex. The pattern ends with \\Z, since $ would
+    also accept a trailing newline.
+    """
+    return Annotated[
+        str,
+        Meta(
+            min_length=digits + 2,
+            max_length=digits + 2,
+            pattern=f"^0x[a-fA-F0-9]{{{digits}}}\\Z",
+        ),
+    ]
 
-    phase0 = "phase0"
-    altair = "altair"
-    bellatrix = "bellatrix"
-    capella = "capella"
 
+Hex40 = hex_string(40)
+Hex64 = hex_string(64)
+ValIndex = Annotated[int, Meta(ge=0)]
+WithdrawalIndex = Annotated[int, Meta(ge=0)]
+PosInt = Annotated[int, Meta(ge=0)]
+# Balances are summed as int64 by the status parser
+Gwei = Annotated[int, Meta(ge=0, le=2**63 - 1)]
 
-class Withdrawal(BaseModel):
+
+class Model(Struct, frozen=True):
+    """Base for the API models, decoded responses are read-only."""
+
+
+class Withdrawal(Model, gc=False):
     """The Withdrawal object from the CL Capella spec."""
 
     index: WithdrawalIndex
@@ -38,75 +48,60 @@ class Withdrawal(BaseModel):
     amount: PosInt
 
 
-class BLSToExecutionChange(BaseModel):
-    """The BLSToExecutionChange object from the CL Capella spec."""
-
-    validator_index: ValIndex
-    from_bls_pubkey: Hex96
-    to_execution_address: Hex40
-
-
-class SignedBLSToExecutionChange(BaseModel):
-    """The SignedBLSToExecutionChange object from the CL Capella spec."""
-
-    message: BLSToExecutionChange
-    signature: Hex192
+class ExecutionPayloadSummary(Model):
+    """The ExecutionPayload fields used by the block parser.
 
+    The transactions are only counted, so they are kept as raw JSON rather than
+    decoded, and the pass-through fields are plain strings.
+    """
 
-class ExecutionPayload(BaseModel):
-    """The ExecutionPayload object from the CL Capella spec."""
-
-    parent_hash: Hex64
-    fee_recipient: Hex40
-    state_root: Hex64
-    receipts_root: Hex64
-    logs_bloom: Hex512
-    prev_randao: Hex64
+    parent_hash: str
+    fee_recipient: str
+    state_root: str
+    receipts_root: str
+    logs_bloom: str
+    prev_randao: str
     block_number: PosInt
     gas_limit: PosInt
     gas_used: PosInt
     timestamp: PosInt
-    extra_data: HexExtraData
+    extra_data: str
     base_fee_per_gas: PosInt
-    block_hash: Hex64
-    transactions: conlist(HexTransaction, max_items=1048576)
-    withdrawals: conlist(
-        Withdrawal, max_items=MAX_WITHDRAWALS_PER_PAYLOAD
-    )  # [New in Capella]
+    block_hash: str
+    transactions: Annotated[list[Raw], Meta(max_length=MAX_TRANSACTIONS_PER_PAYLOAD)]
+    withdrawals: Annotated[
+        list[Withdrawal], Meta(max_length=MAX_WITHDRAWALS_PER_PAYLOAD)
+    ]
 
 
-class BeaconBlockBody(BaseModel):
-    """The BeaconBlockBody object from the CL Bellatrix spec."""
+class BeaconBlockBodySummary(Model):
+    """The BeaconBlockBody fields used by the block parser."""
 
-    execution_payload: Optional[ExecutionPayload]
-    bls_to_execution_changes: conlist(
-        SignedBLSToExecutionChange, max_items=MAX_BLS_TO_EXECUTION_CHANGES
-    )  # [New in Capella]
+    execution_payload: Optional[ExecutionPayloadSummary] = None
 
 
-class BeaconBlock(BaseModel):
-    """The BeaconBlock object from the CL Bellatrix spec."""
+class BeaconBlockSummary(Model):
+    """The BeaconBlock fields used by the block parser."""
 
     slot: PosInt
     proposer_index: ValIndex
-    parent_root: Hex64
-    state_root: Hex64
-    body: BeaconBlockBody
+    body: BeaconBlockBodySummary
+
 
+class SignedBeaconBlockSummary(Model):
+    """The SignedBeaconBlock fields used by the block parser."""
 
-class SignedBeaconBlock(BaseModel):
-    """The SignedBeaconBlock object envelope from the CL Bellatrix spec."""
+    message: BeaconBlockSummary
 
-    message: BeaconBlock
-    signature: Hex192
 
+class EthereumApiBlockSummaryResponse(Model):
+    """The /eth/v2/beacon/blocks/{block_id} response fields used by the block parser.
 
-class EthereumApiBlockResponse(BaseModel):
-    """The API response from /eth/v2/beacon/blocks/{block_id} method."""
+    Every other field, e.g. signatures and BLS changes, is skipped while decoding
+    instead of being validated.
+    """
 
-    version: EthereumVersion
-    execution_optimistic: bool
-    data: SignedBeaconBlock
+    data: SignedBeaconBlockSummary
 
 
 class EthereumApiValidatorStatus(Enum):
@@ -127,30 +122,22 @@ class EthereumApiValidatorStatus(Enum):
     withdrawal = "withdrawal"
 
 
-class EthereumApiValidatorData(BaseModel):
-    """The Validator container from the CL phase0 spec."""
+# The status values as a Literal, so they are validated but decode to plain strings
+EthereumApiValidatorStatusValue = Literal[
+    tuple(status.value for status in EthereumApiValidatorStatus)
+]
 
-    pubkey: Hex96
-    withdrawal_credentials: Hex64
-    effective_balance: PosInt
-    slashed: bool
-    activation_eligibility_epoch: PosInt
-    activation_epoch: PosInt
-    exit_epoch: PosInt
-    withdrawable_epoch: PosInt
 
+class EthereumApiValidatorDataSummary(Model, gc=False):
+    """The Validator container fields used by the status parser."""
 
-class EthereumApiValidator(BaseModel):
-    """The Validators Balance information."""
-
-    index: ValIndex
-    balance: PosInt
-    status: EthereumApiValidatorStatus
-    validator: EthereumApiValidatorData
+    withdrawal_credentials: Hex64
+    slashed: bool
 
 
-class EthereumApiValidators(BaseModel):
-    """The API response from /eth/v1/beacon/states/{state_id}/validators method."""
+class EthereumApiValidatorSummary(Model, gc=False):
+    """The Validators Balance fields used by the status parser."""
 
-    execution_optimistic: bool
-    data: Union[EthereumApiValidator, list[EthereumApiValidator]]
+    balance: Gwei
+    status: EthereumApiValidatorStatusValue
+    validator: EthereumApiValidatorDataSummary
@@ -4,7 +4,7 @@ import logging
 from datetime import datetime, timedelta
 from eth_withdrawals.constants import DATA_DIR
 
-from eth_withdrawals.utils import get_output_format, write_data
+from eth_withdrawals.utils import get_output_format, get_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SupplyParser")
@@ -81,32 +81,36 @@ def main():
     """Main function to orchestrate the processing of finalized slots."""
     output_format = get_output_format()
 
-    eth_supply_output_file = DATA_DIR / f"circulating_supply.{output_format}"
+    eth_supply_writer = get_writer(
+        DATA_DIR / f"circulating_supply.{output_format}", output_format
+    )
 
     next_whole_minute = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(
         minutes=1
     )
     logger.info("Waiting until the next whole minute.")
     sleep((next_whole_minute - datetime.utcnow()).total_seconds())
-    while True:
-        data = {"timestamp": next_whole_minute.isoformat() + "Z"}
-        next_whole_minute = next_whole_minute + timedelta(minutes=1)
+    with eth_supply_writer:
+        while True:
+            data = {"timestamp": next_whole_minute.isoformat() + "Z"}
+            next_whole_minute = next_whole_minute + timedelta(minutes=1)
 
-        logger.info("Fetching ethsupply2 data from Etherscan.")
-        ethsupply2_data = get_ethsupply2()
+            logger.info("Fetching ethsupply2 data from Etherscan.")
+            ethsupply2_data = get_ethsupply2()
 
-        sleep(6)  # rate limit is 1 request/5seconds
+            sleep(6)  # rate limit is 1 request/5seconds
 
-        logger.info("Fetching the beacon chain deposits data from Etherscan.")
-        beacon_chain_deposits_data = get_beacon_chain_deposits()
+            logger.info("Fetching the beacon chain deposits data from Etherscan.")
+            beacon_chain_deposits_data = get_beacon_chain_deposits()
 
-        data |= ethsupply2_data | beacon_chain_deposits_data
-        logger.info("Transforming circulating supply data.")
-        eth_supply = transform_etherscan_data(data)
+            data |= ethsupply2_data | beacon_chain_deposits_data
+            logger.info("Transforming circulating supply data.")
+            eth_supply = transform_etherscan_data(data)
 
-        write_data(eth_supply, eth_supply_output_file, output_format)
+            eth_supply_writer.write(eth_supply)
+            eth_supply_writer.flush()
 
-        sleep((next_whole_minute - datetime.utcnow()).total_seconds())
+            sleep((next_whole_minute - datetime.utcnow()).total_seconds())
 
 
 if __name__ == "__main__":
@@ -1,15 +1,21 @@
 import csv
 import datetime
+import functools
+import json
+import re
 import sys
-import jsonlines
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+import orjson
 
 from eth_withdrawals.constants import (
     GENESIS_TIMESTAMP,
     SECONDS_PER_SLOT,
     SLOTS_PER_EPOCH,
+    WRITE_BUFFER_SIZE,
 )
-import pendulum
-from typing import Union
+from typing import Any, Iterable, Optional, Sequence, Union
 
 
 class EthereumAPIError(Exception):
@@ -33,9 +39,14 @@ class MissingHeightError(Exception):
     pass
 
 
+# Epochs are a power of two slots, so the epoch is a shift instead of a division
+assert SLOTS_PER_EPOCH & (SLOTS_PER_EPOCH - 1) == 0, "SLOTS_PER_EPOCH must be 2**n"
+EPOCH_SHIFT = SLOTS_PER_EPOCH.bit_length() - 1
+
+
 def SlotToEpoch(slot: int) -> int:
     """Convert slot to epochs."""
-    return slot // SLOTS_PER_EPOCH
+    return slot >> EPOCH_SHIFT
 
 
 def SlotToUnixEpoch(slot: int) -> int:
@@ -43,6 +54,16 @@ def SlotToUnixEpoch(slot: int) -> int:
     return GENESIS_TIMESTAMP + slot * SECONDS_PER_SLOT
 
 
+def SecondsToFinalization(slot: int) -> float:
+    """Seconds until the epoch starting at slot is expected to be finalized.
+
+    An epoch is finalized at the start of the epoch two after it, allow one more
+    slot for the node to process that epoch transition.
+    """
+    return SlotToUnixEpoch(slot + 2 * SLOTS_PER_EPOCH + 1) - time.time()
+
+
+@functools.lru_cache(maxsize=8192)
 def SlotToTime(slot: int) -> datetime:
     """Convert slot into UTC localized datetime."""
     return datetime.datetime.fromtimestamp(
@@ -53,8 +74,11 @@ def SlotToTime(slot: int) -> datetime:
 def DateTimeConverter(dt_input: Union[datetime.datetime, datetime.date]) -> str:
     """Convert a datetime to a custom format."""
     if isinstance(dt_input, datetime.datetime):
-        pendulum_ts = pendulum.instance(dt_input)
-        return pendulum_ts.format(r"YYYY-MM-DDTHH:mm:ss.SSS\Z")
+        # Inputs are UTC, so the format is fixed to milliseconds and a Z suffix
+        return (
+            dt_input.strftime("%Y-%m-%dT%H:%M:%S.")
+            + f"{dt_input.microsecond // 1000:03d}Z"
+        )
     if isinstance(dt_input, datetime.date):
         return dt_input.strftime("%Y-%m-%d")
 
@@ -75,40 +99,187 @@ def get_output_format(default: str = "jsonl") -> str:
     return output_format
 
 
-def write_data(data: dict, path: str, output_format: str = "jsonl") -> None:
-    """Write data to a file.
+class Writer(ABC):
+    """Base class for the output writers.
+
+    The file is opened once and kept open for the lifetime of the writer, so
+    records are buffered instead of reopening the file for every record.
+    """
+
+    def __init__(self, path: Path, mode: str, **kwargs) -> None:
+        self.f = open(path, mode, buffering=WRITE_BUFFER_SIZE, **kwargs)
+
+    @abstractmethod
+    def write(self, data: dict) -> None:
+        """Write a record.
+
+        :param data: the record to write
+        :type data: dict
+        """
+
+    def write_many(self, records: Iterable[dict]) -> None:
+        """Write several records.
+
+        :param records: the records to write
+        :type records: Iterable[dict]
+        """
+        for data in records:
+            self.write(data)
+
+    def flush(self) -> None:
+        """Flush the buffered records to disk."""
+        self.f.flush()
+
+    def close(self) -> None:
+        self.f.close()
+
+    def __enter__(self) -> "Writer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonlWriter(Writer):
+    """Write records to a JSON lines file."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path, "ab")
+
+    @staticmethod
+    def encode(data: dict) -> bytes:
+        """Encode a record as a JSON line.
+
+        :param data: the record to encode
+        :type data: dict
+        """
+        try:
+            return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            # orjson only handles 64-bit integers, wei amounts can be larger. Written in
+            # the same compact UTF-8 form as orjson's output
+            return (
+                json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+                + b"\n"
+            )
+
+    def write(self, data: dict) -> None:
+        """Write a record.
+
+        :param data: the record to write
+        :type data: dict
+        """
+        self.f.write(self.encode(data))
+
+    def write_many(self, records: Iterable[dict]) -> None:
+        """Write several records with a single write.
 
-    :param data:
-    :type data: dict
-    :param path:
-    :type path: str
+        :param records: the records to write
+        :type records: Iterable[dict]
+        """
+        self.f.write(b"".join([self.encode(data) for data in records]))
+
+
+NEEDS_QUOTING = re.compile(r'[,"\r\n]')
+
+
+def quote_csv_value(value: Any) -> str:
+    """Format a csv value, quoting it the way the csv module does when needed.
+
+    :param value: the value to format
+    :type value: Any
+    """
+    value = str(value)
+    if NEEDS_QUOTING.search(value) is None:
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+
+class CsvWriter(Writer):
+    """Write records to a csv, handling the header.
+
+    When the fieldnames are given, rows are formatted directly in that order. Only
+    the values of the quoted_fields are checked for characters that need quoting,
+    every other value is written as is. Otherwise the columns are taken from the
+    first record written. Empty records are skipped.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fieldnames: Optional[Sequence[str]] = None,
+        quoted_fields: Iterable[str] = (),
+    ) -> None:
+        self.wrote_header = path.is_file()
+        super().__init__(path, "a", newline="")
+        self.fieldnames = fieldnames
+        quoted_fields = set(quoted_fields)
+        self.columns = [
+            (key, quote_csv_value if key in quoted_fields else str)
+            for key in fieldnames or ()
+        ]
+        self.writer = None
+
+    def write(self, data: dict) -> None:
+        """Write a record.
+
+        :param data: the record to write
+        :type data: dict
+        """
+        self.write_many((data,))
+
+    def write_many(self, records: Iterable[dict]) -> None:
+        """Write several records, with a single write when the fieldnames are given.
+
+        :param records: the records to write
+        :type records: Iterable[dict]
+        """
+        records = [data for data in records if data]
+        if not records:
+            return
+        if self.fieldnames is not None:
+            if not self.wrote_header:
+                self.f.write(",".join(self.fieldnames) + "\r\n")
+                self.wrote_header = True
+            self.f.write(
+                "".join(
+                    [
+                        ",".join([to_str(data[key]) for key, to_str in self.columns])
+                        + "\r\n"
+                        for data in records
+                    ]
+                )
+            )
+            return
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.f, fieldnames=records[0].keys())
+            if not self.wrote_header:
+                self.writer.writeheader()
+                self.wrote_header = True
+        self.writer.writerows(records)
+
+
+def get_writer(
+    path: Path,
+    output_format: str = "jsonl",
+    fieldnames: Optional[Sequence[str]] = None,
+    quoted_fields: Iterable[str] = (),
+) -> Writer:
+    """Get a writer for the output format.
+
+    :param path: the file path
+    :type path: Path
     :param output_format:
     :type output_format: str, defaults to 'jsonl'
+    :param fieldnames: the fixed csv columns, see `CsvWriter`
+    :type fieldnames: Sequence[str], optional
+    :param quoted_fields: the csv columns which may need quoting, see `CsvWriter`
+    :type quoted_fields: Iterable[str], optional
     :raises ValueError: if output_format is not supported
     """
     if output_format in ["json", "jsonl"]:
-        with jsonlines.open(path, mode="a") as f:
-            f.write(data)
+        return JsonlWriter(path)
     elif output_format == "csv":
-        write_dictionary_to_csv(data, path)
+        return CsvWriter(path, fieldnames, quoted_fields)
     else:
         raise ValueError(f"Unknown output format: {output_format}")
-
-
-def write_dictionary_to_csv(data: dict, path: str) -> None:
-    """Write the contents of a dict to a csv, handling the header.
-
-    :param data: the data to write
-    :type data: dict
-    :param path: the file path
-    :type path: str
-    """
-    file_exists = path.is_file()
-    mode = "a" if file_exists else "w"
-
-    with open(path, mode, newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=data.keys())
-
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(data)
@@ -0,0 +1,64 @@
+"""Tests for the consensus API fetcher."""
+import logging
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_withdrawals.fetcher import Fetcher
+from eth_withdrawals.utils import EthereumAPIError, MissingHeightError, RequestError
+
+RESPONSES = {
+    "/ok": (200, b'{"data":[]}'),
+    "/missing": (404, b'{"code":404,"message":"Could not get validator container"}'),
+    "/bad-request": (400, b'{"code":400,"message":"Invalid state ID"}'),
+    "/not-json": (503, b"Service Unavailable"),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        code, body = RESPONSES[self.path]
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetchStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.fetcher = Fetcher(
+            f"http://127.0.0.1:{cls.server.server_port}", logging.getLogger("test")
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def fetch_stream(self, method: str) -> bytes:
+        return b"".join(
+            self.fetcher.fetch_stream(method, "Could not get validator container")
+        )
+
+    def test_streams_body(self):
+        self.assertEqual(self.fetch_stream("/ok"), b'{"data":[]}')
+
+    def test_error_envelopes(self):
+        with self.assertRaises(MissingHeightError):
+            self.fetch_stream("/missing")
+        with self.assertRaises(EthereumAPIError):
+            self.fetch_stream("/bad-request")
+
+    def test_error_without_envelope(self):
+        with self.assertRaises(RequestError):
+            self.fetch_stream("/not-json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Tests for the validator status parser."""
+import json
+import unittest
+
+import msgspec
+from msgspec import ValidationError
+
+from eth_withdrawals import validator_parser
+from eth_withdrawals.utils import RequestError
+
+TYPE_0_CREDENTIALS = "0x00" + "ab" * 31
+TYPE_1_CREDENTIALS = "0x01" + "00" * 11 + "cd" * 20
+
+
+def make_validator(
+    index: int,
+    status: str = "active_ongoing",
+    balance: int = 32_000_000_000,
+    slashed: bool = False,
+    withdrawal_credentials: str = TYPE_0_CREDENTIALS,
+) -> dict:
+    """A validator in the api format, integers are quoted like the api does."""
+    return {
+        "index": str(index),
+        "balance": str(balance),
+        "status": status,
+        "validator": {
+            "pubkey": "0x" + "12" * 48,
+            "withdrawal_credentials": withdrawal_credentials,
+            "effective_balance": "32000000000",
+            "slashed": slashed,
+            "activation_eligibility_epoch": "0",
+            "activation_epoch": "0",
+            "exit_epoch": "18446744073709551615",
+            "withdrawable_epoch": "18446744073709551615",
+        },
+    }
+
+
+def split(body: bytes, size: int) -> list[bytes]:
+    """Split a response body into pieces, like a streamed download."""
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def stream(body: bytes, size: int = 1024, chunk_bytes: int = 1000) -> list:
+    """Stream a response body and decode the validators of every chunk."""
+    return [
+        validator
+        for chunk in validator_parser.stream_validators(split(body, size), chunk_bytes)
+        for validator in msgspec.json.decode(chunk)
+    ]
+
+
+def parse(body: bytes) -> dict:
+    """Parse a validators response body."""
+    return validator_parser.parse_validator_status(
+        validator_parser.stream_validators([body]), 6400
+    )
+
+
+class TestParseValidatorStatus(unittest.TestCase):
+    def test_aggregates_statuses(self):
+        validators = [
+            make_validator(0),
+            make_validator(1, withdrawal_credentials=TYPE_1_CREDENTIALS),
+            make_validator(2, "exited_slashed", 1, slashed=True),
+            make_validator(3, "withdrawal_done", 0),
+        ]
+        result = parse(json.dumps({"data": validators}).encode())
+
+        self.assertEqual(result["total_count"], 4)
+        self.assertEqual(result["total_balance"], 64_000_000_001)
+        self.assertEqual(result["type_1_addr_count"], 1)
+        self.assertEqual(result["slashed_count"], 1)
+        self.assertEqual(result["exited_count"], 1)
+        self.assertEqual(result["active_ongoing_count"], 2)
+        self.assertEqual(result["active_ongoing_balance"], 64_000_000_000)
+        self.assertEqual(result["pending_queued_count"], 0)
+        self.assertEqual(
+            list(result), list(validator_parser.VALIDATOR_STATUS_CSV_FIELDS)
+        )
+
+    def test_parallel_matches_serial(self):
+        validators = [
+            make_validator(i, status, i, withdrawal_credentials=credentials)
+            for i, (status, credentials) in enumerate(
+                [
+                    ("active_ongoing", TYPE_0_CREDENTIALS),
+                    ("exited_unslashed", TYPE_1_CREDENTIALS),
+                    ("pending_queued", TYPE_1_CREDENTIALS),
+                ]
+                * 20
+            )
+        ]
+        body = json.dumps({"data": validators}).encode()
+        chunks = list(validator_parser.stream_validators([body], chunk_bytes=1000))
+        self.assertGreater(len(chunks), 2)
+
+        self.assertEqual(
+            validator_parser.parse_validator_status(chunks, 6400, processes=2),
+            parse(body),
+        )
+
+    def test_rejects_invalid_credentials(self):
+        validator = make_validator(0, withdrawal_credentials="0x01" + "é" * 62)
+        with self.assertRaises(ValidationError):
+            parse(json.dumps({"data": [validator]}, ensure_ascii=False).encode())
+
+    def test_rejects_balance_over_int64(self):
+        validator = make_validator(0, balance=2**64)
+        with self.assertRaises(ValidationError):
+            parse(json.dumps({"data": [validator]}).encode())
+
+
+class TestStreamValidators(unittest.TestCase):
+    validators = [make_validator(i) for i in range(10)]
+
+    def test_splits_between_validators(self):
+        body = json.dumps({"data": self.validators}).encode()
+        # Pieces which end mid-object and mid-separator, and chunks of one validator
+        for size in [1, 2, 3, 7, 64, 1000, len(body)]:
+            for chunk_bytes in [1, 500, 10**6]:
+                with self.subTest(size=size, chunk_bytes=chunk_bytes):
+                    self.assertEqual(stream(body, size, chunk_bytes), self.validators)
+
+    def test_pretty_printed(self):
+        for indent in [2, "\t"]:
+            body = json.dumps({"data": self.validators}, indent=indent).encode()
+            for size in [1, 5, 4096]:
+                with self.subTest(indent=indent, size=size):
+                    self.assertEqual(stream(body, size, 700), self.validators)
+
+    def test_other_keys(self):
+        other = {
+            "execution_optimistic": False,
+            "finalized": True,
+            "list": [{"a": "]"}, {"b": 1}],
+        }
+        for response in [
+            {**other, "data": self.validators},
+            {"data": self.validators, **other},
+        ]:
+            body = json.dumps(response).encode()
+            for size in [1, 3, 4096]:
+                with self.subTest(keys=list(response), size=size):
+                    self.assertEqual(stream(body, size), self.validators)
+
+    def test_empty(self):
+        for body in [b'{"data":[]}', b'{"data": [ ], "finalized": [{}, {}]}']:
+            with self.subTest(body=body):
+                self.assertEqual(stream(body, 1, 1), [])
+                self.assertEqual(parse(body), {})
+
+    def test_malformed(self):
+        validator = json.dumps(make_validator(0)).encode()
+        for body in [
+            b'{"data":[' + validator + b",]}",
+            b'{"data":[' + validator + b"," + validator[:-1] + b"]}",
+        ]:
+            with self.subTest(body=body):
+                with self.assertRaises(RequestError):
+                    parse(body)
+
+    def test_truncated(self):
+        body = json.dumps({"data": self.validators, "finalized": True}).encode()
+        data_start = body.index(b"[")
+        data_end = body.rindex(b"]")
+        for end in range(data_start + 1, data_end, 37):
+            with self.subTest(end=end):
+                with self.assertRaises(RequestError):
+                    stream(body[:end], 64, 500)
+        with self.assertRaises(ValidationError):
+            stream(body[:data_start], 64, 500)
+
+    def test_error_envelope(self):
+        body = b'{"code":404,"message":"Could not get validator container"}'
+        with self.assertRaises(ValidationError):
+            stream(body)
+
+
+if __name__ == "__main__":
+    unittest.main()